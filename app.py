@@ -1,22 +1,58 @@
-import re
+import json
+import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
-from spellchecker import SpellChecker
-from faster_whisper import WhisperModel
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.pagesizes import A4
 import requests
 from streamlit_lottie import st_lottie
 
+from core.audio import WHISPER_MODELS, transcribe_upload
+from core.executor import get_pdf_pool
+from core.nlp import (
+    basic_grammar_checks,
+    merge_issues,
+    safe_spell_correct,
+    tokenize_with_positions,
+)
+from core.pdf import generate_pdf
+from core.ui import show_issues
+
+BASE_DIR = Path.cwd()
+ASSET_DIR = BASE_DIR / "assets"
+ASSET_DIR.mkdir(exist_ok=True)
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _fetch_lottie(url: str):
+    # raises on failure: st.cache_data does not cache exceptions, so a
+    # timeout is retried on the next rerun instead of sticking for a day.
+    # The first successful download is kept in ASSET_DIR, so later cold
+    # starts never touch the network.
+    local_path = ASSET_DIR / url.rsplit("/", 1)[-1]
+    if local_path.exists():
+        try:
+            return json.loads(local_path.read_text())
+        except ValueError:
+            # corrupt local copy: drop it and download again
+            local_path.unlink(missing_ok=True)
+    r = requests.get(url, timeout=(1, 3))
+    r.raise_for_status()
+    data = r.json()
+    try:
+        # temp file + rename, so a crash never leaves half a file behind
+        with tempfile.NamedTemporaryFile(
+            "w", dir=ASSET_DIR, suffix=".tmp", delete=False
+        ) as f:
+            f.write(r.text)
+        os.replace(f.name, local_path)
+    except OSError:
+        pass
+    return data
+
 def load_lottie_url(url: str):
     try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return None
-        return r.json()
+        return _fetch_lottie(url)
     except Exception:
         return None
 
@@ -25,12 +61,6 @@ def load_lottie_url(url: str):
 # =====================================================
 st.set_page_config(page_title="English Evaluator", layout="wide")
 
-BASE_DIR = Path.cwd()
-REPORT_DIR = BASE_DIR / "reports"
-REPORT_DIR.mkdir(exist_ok=True)
-
-spell = SpellChecker(distance=1)
-
 TOPICS = [
     "Oman culture",
     "Oman tourism",
@@ -49,151 +79,12 @@ PROMPTS = {
     "Omani schools and education": "Write/speak about schools in Oman and how education can improve.",
 }
 
-# =====================================================
-# CACHE Whisper
-# =====================================================
-@st.cache_resource
-def load_whisper():
-    return WhisperModel("base", device="cpu", compute_type="int8")
-
 # =====================================================
 # UTIL
 # =====================================================
-def generate_pdf(filename, title, lines):
-    pdf_path = REPORT_DIR / filename
-    doc = SimpleDocTemplate(str(pdf_path), pagesize=A4)
-    style = ParagraphStyle(name="Normal", fontSize=10, leading=12)
-    elements = [Paragraph(f"<b>{title}</b>", style), Spacer(1, 12)]
-    for line in lines:
-        elements.append(Paragraph(str(line).replace("\n", "<br/>"), style))
-        elements.append(Spacer(1, 6))
-    doc.build(elements)
-    return pdf_path
-
-def tokenize_with_positions(text):
-    # words + punctuation tokens
-    tokens = []
-    for m in re.finditer(r"[A-Za-z']+|[0-9]+|[^\w\s]", text):
-        tokens.append((m.group(0), m.start(), m.end()))
-    return tokens
-
-def is_probable_proper_noun(word, original_text):
-    # preserve Oman, GCC, names, email-like tokens
-    if word.isupper() and len(word) <= 6:
-        return True
-    if word[:1].isupper():
-        return True
-    if "@" in word:
-        return True
-    return False
-
-def safe_spell_correct(text):
-    """
-    Correct ONLY obvious spelling mistakes.
-    Preserve proper nouns and very short tokens.
-    """
-    tokens = tokenize_with_positions(text)
-    words = [t[0] for t in tokens if re.fullmatch(r"[A-Za-z']+", t[0])]
-    misspelled = spell.unknown([w.lower() for w in words])
-
-    issues = []
-    corrected_parts = list(text)
-
-    # Replace from end to start to keep indices stable
-    replacements = []
-    for tok, s, e in tokens:
-        if not re.fullmatch(r"[A-Za-z']+", tok):
-            continue
-        low = tok.lower()
-
-        if low in misspelled:
-            # preserve proper nouns and short words
-            if is_probable_proper_noun(tok, text):
-                continue
-            if len(tok) <= 2:
-                continue
-
-            suggestion = spell.correction(low)
-            # safety: only accept if suggestion exists and differs
-            if suggestion and suggestion != low:
-                replacements.append((s, e, suggestion))
-                issues.append({
-                    "Type": "Spelling",
-                    "Original": tok,
-                    "Suggestion": suggestion,
-                    "Message": f"Possible misspelling: '{tok}' → '{suggestion}'"
-                })
-
-    # apply replacements backwards
-    for s, e, rep in sorted(replacements, key=lambda x: x[0], reverse=True):
-        corrected_parts[s:e] = list(rep)
-
-    corrected_text = "".join(corrected_parts)
-
-    return corrected_text, issues
-
-def basic_grammar_checks(text):
-    """
-    Lightweight grammar flags (rule-based).
-    Not a full grammar engine, but reliable and cloud-safe.
-    """
-    issues = []
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    joined = " ".join(lines)
-
-    # 1) Sentence punctuation
-    if joined and joined[-1] not in ".!?":
-        issues.append({
-            "Type": "Grammar",
-            "Original": joined[-20:],
-            "Suggestion": joined + ".",
-            "Message": "Sentence may be missing ending punctuation."
-        })
-
-    # 2) Capitalization: first letter
-    if joined and joined[0].islower():
-        issues.append({
-            "Type": "Grammar",
-            "Original": joined[:20],
-            "Suggestion": joined[:1].upper() + joined[1:],
-            "Message": "Start sentences with a capital letter."
-        })
-
-    # 3) Common subject–verb agreement patterns (simple)
-    # "Oman are" -> "Oman is"
-    joined_low = joined.lower()
-    for pattern, repl, msg in [
-        (r"\boman are\b", "Oman is", "Subject–verb agreement: 'Oman is' not 'Oman are'."),
-        (r"\b(today class is)\b", "Today's class is", "Use possessive form: 'Today's class'."),
-        (r"\bi wnat\b", "I want", "Common misspelling/phrase correction: 'I want'."),
-        (r"\bevry\b", "every", "Common misspelling: 'every'."),
-        (r"\bcontry\b", "country", "Common misspelling: 'country'."),
-    ]:
-        if re.search(pattern, joined_low):
-            issues.append({
-                "Type": "Grammar",
-                "Original": re.search(pattern, joined_low).group(0),
-                "Suggestion": repl,
-                "Message": msg
-            })
-
-    # 4) Location sanity (example: "Oman ... located in jordan")
-    if re.search(r"\boman\b", joined_low) and re.search(r"\blocated in jordan\b", joined_low):
-        issues.append({
-            "Type": "Grammar",
-            "Original": "located in jordan",
-            "Suggestion": "located in the Middle East (on the Arabian Peninsula).",
-            "Message": "Factual geography note: Oman is not located in Jordan."
-        })
-
-    return issues
-
-def merge_issues(spell_issues, grammar_issues):
-    return spell_issues + grammar_issues
-
 def recommendations_from_issues(issues):
-    spell_n = sum(1 for i in issues if i["Type"] == "Spelling")
-    gram_n = sum(1 for i in issues if i["Type"] == "Grammar")
+    spell_n = (issues["Type"] == "Spelling").sum()
+    gram_n = (issues["Type"] == "Grammar").sum()
 
     recs = []
     if spell_n:
@@ -289,21 +180,10 @@ if mode == "Writing Evaluation":
         grammar_issues = basic_grammar_checks(corrected_spell)
         issues = merge_issues(spell_issues, grammar_issues)
 
-        st.subheader("Corrected Version (safe)")
-        st.write(corrected_spell)
-
-        st.subheader("Detected Issues")
-        if issues:
-            st.dataframe(issues, use_container_width=True)
-        else:
-            st.success("No major issues detected by the lightweight checker.")
-
-        st.subheader("Recommendations")
-        for r in recommendations_from_issues(issues):
-            st.write(f"- {r}")
-
+        # the report is built in a worker process while the results render below
         pdf_name = f"writing_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = generate_pdf(
+        pdf_future = get_pdf_pool().submit(
+            generate_pdf,
             pdf_name,
             "Writing Evaluation Report",
             [
@@ -321,62 +201,60 @@ if mode == "Writing Evaluation":
             ]
         )
 
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f, file_name=pdf_name, mime="application/pdf")
+        st.subheader("Corrected Version (safe)")
+        st.write(corrected_spell)
+
+        st.subheader("Detected Issues")
+        if not issues.empty:
+            show_issues(issues)
+        else:
+            st.success("No major issues detected by the lightweight checker.")
+
+        st.subheader("Recommendations")
+        st.markdown("\n".join(f"- {r}" for r in recommendations_from_issues(issues)))
+
+        st.download_button("Download PDF Report", pdf_future.result(), file_name=pdf_name, mime="application/pdf")
 
 # =====================================================
 # SPEAKING (Upload audio)
 # =====================================================
 else:
     st.subheader("Upload your speaking recording (.wav or .mp3)")
-    audio_file = st.file_uploader("Upload Audio File", type=["wav", "mp3"])
+    audio_files = st.file_uploader("Upload Audio File", type=["wav", "mp3"], accept_multiple_files=True)
+    speed = st.radio("Transcription", list(WHISPER_MODELS), horizontal=True)
 
-    if audio_file is not None:
-        st.audio(audio_file)
+    pending_reports = []
 
-        tmp_path = BASE_DIR / "temp_audio.wav"
-        with open(tmp_path, "wb") as f:
-            f.write(audio_file.read())
+    # shortest first so the first results appear quickly; one loaded
+    # model and the shared executor serve every file
+    for i, audio_file in enumerate(sorted(audio_files, key=lambda f: f.size)):
+        st.divider()
+        st.header(audio_file.name)
 
-        with st.spinner("Transcribing speech..."):
-            model = load_whisper()
-            segments, info = model.transcribe(str(tmp_path))
-            transcript = " ".join([seg.text.strip() for seg in segments]).strip()
+        audio_bytes = audio_file.getvalue()
+        st.audio(audio_bytes, format=audio_file.type)
 
         st.subheader("Transcript")
-        st.write(transcript if transcript else "(No speech detected)")
-
-        corrected_spell, spell_issues = safe_spell_correct(transcript)
-        grammar_issues = basic_grammar_checks(corrected_spell)
-        issues = merge_issues(spell_issues, grammar_issues)
+        transcript_placeholder = st.empty()
 
-        st.subheader("Corrected Transcript (safe)")
-        st.write(corrected_spell)
+        with st.spinner("Transcribing speech..."):
+            transcript, duration, speech = transcribe_upload(audio_bytes, transcript_placeholder, WHISPER_MODELS[speed])
 
-        if issues:
-            st.subheader("Detected Issues")
-            st.dataframe(issues, use_container_width=True)
-        else:
-            st.success("No major issues detected by the lightweight checker.")
+        transcript_placeholder.write(transcript if transcript else "(No speech detected)")
 
-        words = len(re.findall(r"\b\w+\b", transcript))
-        duration = getattr(info, "duration", None)
-        wpm = (words / duration) * 60 if duration and duration > 0 else None
+        # one tokenization feeds both the word count and the spell check
+        tokens = tokenize_with_positions(transcript)
+        words = sum(1 for tok, _, _ in tokens if any(c.isalnum() for c in tok))
 
-        st.subheader("Speaking Metrics")
-        st.write(f"Words: {words}")
-        if duration:
-            st.write(f"Duration (s): {duration:.1f}")
-        if wpm:
-            st.write(f"Estimated WPM: {wpm:.1f}")
-
-        st.subheader("Recommendations")
-        for r in recommendations_from_issues(issues):
-            st.write(f"- {r}")
-        st.write("- Practice pronunciation by repeating corrected sentences slowly, then faster.")
+        corrected_spell, spell_issues = safe_spell_correct(transcript, tokens)
+        grammar_issues = basic_grammar_checks(corrected_spell)
+        issues = merge_issues(spell_issues, grammar_issues)
+        # words per minute of actual speech; VAD drops the pauses
+        wpm = (words / speech) * 60 if speech and speech > 0 else None
 
-        pdf_name = f"speaking_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = generate_pdf(
+        pdf_name = f"speaking_report_{Path(audio_file.name).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        pdf_future = get_pdf_pool().submit(
+            generate_pdf,
             pdf_name,
             "Speaking Evaluation Report",
             [
@@ -393,9 +271,36 @@ else:
                 f"Total issues: {len(issues)} (Spelling={len(spell_issues)}, Grammar={len(grammar_issues)})",
                 f"Words: {words}",
                 f"Duration (s): {duration:.1f}" if duration else "Duration (s): —",
+                f"Speaking time (s): {speech:.1f}" if speech else "Speaking time (s): —",
                 f"WPM: {wpm:.1f}" if wpm else "WPM: —",
             ]
         )
 
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f, file_name=pdf_name, mime="application/pdf")
+        st.subheader("Corrected Transcript (safe)")
+        st.write(corrected_spell)
+
+        if not issues.empty:
+            st.subheader("Detected Issues")
+            show_issues(issues)
+        else:
+            st.success("No major issues detected by the lightweight checker.")
+
+        st.subheader("Speaking Metrics")
+        st.write(f"Words: {words}")
+        if duration:
+            st.write(f"Duration (s): {duration:.1f}")
+        if speech:
+            st.write(f"Speaking time (s): {speech:.1f}")
+        if wpm:
+            st.write(f"Estimated WPM: {wpm:.1f}")
+
+        st.subheader("Recommendations")
+        recs = recommendations_from_issues(issues)
+        recs.append("Practice pronunciation by repeating corrected sentences slowly, then faster.")
+        st.markdown("\n".join(f"- {r}" for r in recs))
+
+        # filled in after the loop, so every file's report builds in parallel
+        pending_reports.append((st.empty(), pdf_future, pdf_name, f"pdf_{i}"))
+
+    for slot, future, pdf_name, key in pending_reports:
+        slot.download_button("Download PDF Report", future.result(), file_name=pdf_name, mime="application/pdf", key=key)
@@ -1,15 +1,13 @@
-import re
-import os
 from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
-from spellchecker import SpellChecker
-from textblob import TextBlob
-from faster_whisper import WhisperModel
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.pagesizes import A4
+
+from core.audio import WHISPER_MODELS, transcribe_upload
+from core.executor import get_pdf_pool
+from core.nlp import analyze_text
+from core.pdf import generate_pdf
+from core.ui import show_issues
 
 # =====================================================
 # CONFIGURATION
@@ -17,75 +15,19 @@ from reportlab.lib.pagesizes import A4
 
 st.set_page_config(page_title="English Evaluator", layout="wide")
 
-BASE_DIR = Path.cwd()
-REPORT_DIR = BASE_DIR / "reports"
-REPORT_DIR.mkdir(exist_ok=True)
-
-spell = SpellChecker()
-
-# =====================================================
-# CACHED MODELS
-# =====================================================
-
-@st.cache_resource
-def load_whisper():
-    return WhisperModel("base", device="cpu", compute_type="int8")
-
-# =====================================================
-# TEXT ANALYSIS FUNCTION
-# =====================================================
-
-def analyze_text(text):
-
-    # ---------- SPELLING ----------
-    words = re.findall(r"\b\w+\b", text)
-    misspelled = spell.unknown(words)
-
-    spelling_issues = []
-    for word in misspelled:
-        spelling_issues.append({
-            "Type": "Spelling",
-            "Original": word,
-            "Suggestion": spell.correction(word)
-        })
-
-    # ---------- GRAMMAR ----------
-    blob = TextBlob(text)
-    corrected_text = str(blob.correct())
-
-    grammar_issues = []
-    if corrected_text != text:
-        grammar_issues.append({
-            "Type": "Grammar",
-            "Original": text,
-            "Suggestion": corrected_text
-        })
-
-    issues = spelling_issues + grammar_issues
-
-    return corrected_text, issues
-
-
-# =====================================================
-# PDF GENERATOR
-# =====================================================
-
-def generate_pdf(filename, title, lines):
-    pdf_path = REPORT_DIR / filename
-    doc = SimpleDocTemplate(str(pdf_path), pagesize=A4)
-    elements = []
-    style = ParagraphStyle(name='Normal', fontSize=10)
-
-    elements.append(Paragraph(f"<b>{title}</b>", style))
-    elements.append(Spacer(1, 12))
-
-    for line in lines:
-        elements.append(Paragraph(str(line), style))
-        elements.append(Spacer(1, 6))
-
-    doc.build(elements)
-    return pdf_path
+# static, so each is one markdown string rendered with a single element
+WRITING_RECS_MD = "\n".join(f"- {r}" for r in (
+    "Practice sentence structure using short paragraphs.",
+    "Review subject-verb agreement rules.",
+    "Read your paragraph aloud to improve fluency.",
+    "Focus on vocabulary variation.",
+))
 
+SPEAKING_RECS_MD = "\n".join(f"- {r}" for r in (
+    "Slow down slightly and pause between sentences.",
+    "Practice pronunciation of difficult words.",
+    "Record yourself daily for fluency improvement.",
+))
 
 # =====================================================
 # UI
@@ -121,29 +63,11 @@ if mode == "Writing Evaluation":
 
         corrected, issues = analyze_text(text)
 
-        st.subheader("Corrected Version")
-        st.write(corrected)
-
-        st.subheader("Detected Issues")
-        if issues:
-            st.dataframe(issues, use_container_width=True)
-        else:
-            st.success("No major issues detected.")
-
-        recommendations = [
-            "Practice sentence structure using short paragraphs.",
-            "Review subject-verb agreement rules.",
-            "Read your paragraph aloud to improve fluency.",
-            "Focus on vocabulary variation."
-        ]
-
-        st.subheader("Recommendations")
-        for r in recommendations:
-            st.write("- ", r)
-
+        # the report is built in a worker process while the results render below
         pdf_name = f"writing_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-        pdf_path = generate_pdf(
+        pdf_future = get_pdf_pool().submit(
+            generate_pdf,
             pdf_name,
             "Writing Evaluation Report",
             [
@@ -160,8 +84,19 @@ if mode == "Writing Evaluation":
             ]
         )
 
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f, file_name=pdf_name)
+        st.subheader("Corrected Version")
+        st.write(corrected)
+
+        st.subheader("Detected Issues")
+        if not issues.empty:
+            show_issues(issues)
+        else:
+            st.success("No major issues detected.")
+
+        st.subheader("Recommendations")
+        st.markdown(WRITING_RECS_MD)
+
+        st.download_button("Download PDF Report", pdf_future.result(), file_name=pdf_name)
 
 
 # =====================================================
@@ -172,58 +107,41 @@ else:
 
     st.subheader("Upload your speaking recording (.wav or .mp3)")
 
-    audio_file = st.file_uploader("Upload Audio File", type=["wav", "mp3"])
+    audio_files = st.file_uploader("Upload Audio File", type=["wav", "mp3"], accept_multiple_files=True)
+    speed = st.radio("Transcription", list(WHISPER_MODELS), horizontal=True)
 
-    if audio_file is not None:
+    pending_reports = []
 
-        temp_audio_path = BASE_DIR / "temp_audio.wav"
+    # shortest first so the first results appear quickly; one loaded
+    # model and the shared executor serve every file
+    for i, audio_file in enumerate(sorted(audio_files, key=lambda f: f.size)):
 
-        with open(temp_audio_path, "wb") as f:
-            f.write(audio_file.read())
+        st.divider()
+        st.header(audio_file.name)
 
-        st.audio(audio_file)
+        audio_bytes = audio_file.getvalue()
 
-        with st.spinner("Transcribing speech..."):
-            model = load_whisper()
-            segments, info = model.transcribe(str(temp_audio_path))
-            transcript = " ".join([seg.text for seg in segments])
+        st.audio(audio_bytes, format=audio_file.type)
 
         st.subheader("Transcript")
-        st.write(transcript)
+        transcript_placeholder = st.empty()
 
-        corrected, issues = analyze_text(transcript)
+        with st.spinner("Transcribing speech..."):
+            transcript, duration, speech = transcribe_upload(audio_bytes, transcript_placeholder, WHISPER_MODELS[speed])
 
-        st.subheader("Corrected Transcript")
-        st.write(corrected)
+        transcript_placeholder.write(transcript)
 
-        if issues:
-            st.subheader("Detected Issues")
-            st.dataframe(issues, use_container_width=True)
-        else:
-            st.success("No major issues detected.")
+        corrected, issues = analyze_text(transcript)
 
         # Basic Speaking Metrics
         word_count = len(transcript.split())
-        duration_est = word_count / 2.5  # rough estimation
-        wpm = word_count / (duration_est / 60)
+        # words per minute of actual speech; VAD drops the pauses
+        wpm = round(word_count * 60.0 / max(speech, 1e-3), 1)
 
-        st.subheader("Speaking Metrics")
-        st.write(f"Words: {word_count}")
-        st.write(f"Estimated WPM: {round(wpm,1)}")
+        pdf_name = f"speaking_report_{Path(audio_file.name).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-        recommendations = [
-            "Slow down slightly and pause between sentences.",
-            "Practice pronunciation of difficult words.",
-            "Record yourself daily for fluency improvement."
-        ]
-
-        st.subheader("Recommendations")
-        for r in recommendations:
-            st.write("- ", r)
-
-        pdf_name = f"speaking_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-
-        pdf_path = generate_pdf(
+        pdf_future = get_pdf_pool().submit(
+            generate_pdf,
             pdf_name,
             "Speaking Evaluation Report",
             [
@@ -237,11 +155,34 @@ else:
                 corrected,
                 "",
                 f"Word Count: {word_count}",
-                f"Estimated WPM: {round(wpm,1)}"
+                f"Duration (s): {duration:.1f}",
+                f"Speaking time (s): {speech:.1f}",
+                f"WPM: {wpm}"
             ]
         )
 
-        with open(pdf_path, "rb") as f:
-            st.download_button("Download PDF Report", f, file_name=pdf_name)
+        st.subheader("Corrected Transcript")
+        st.write(corrected)
+
+        if not issues.empty:
+            st.subheader("Detected Issues")
+            show_issues(issues)
+        else:
+            st.success("No major issues detected.")
+
+        st.subheader("Speaking Metrics")
+        st.write(f"Words: {word_count}")
+        st.write(f"Duration (s): {duration:.1f}")
+        st.write(f"Speaking time (s): {speech:.1f}")
+        st.write(f"WPM: {wpm}")
+
+        st.subheader("Recommendations")
+        st.markdown(SPEAKING_RECS_MD)
+
+        # filled in after the loop, so every file's report builds in parallel
+        pending_reports.append((st.empty(), pdf_future, pdf_name, f"pdf_{i}"))
+
+    for slot, future, pdf_name, key in pending_reports:
+        slot.download_button("Download PDF Report", future.result(), file_name=pdf_name, key=key)
 
 
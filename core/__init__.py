@@ -0,0 +1 @@
+"""Shared helpers for the English evaluator Streamlit apps."""
@@ -0,0 +1,173 @@
+import os
+import io
+import json
+import hashlib
+import queue
+import tempfile
+from pathlib import Path
+
+import streamlit as st
+
+from core.executor import get_executor
+
+# faster_whisper pulls in CTranslate2, PyAV and onnxruntime, so it is
+# imported inside the functions below, which run on the executor: the
+# default model loads in the background at start-up (see the end of this
+# module) and never blocks a script run.
+
+# "auto" lets CTranslate2 pick the fastest type the device supports
+# (int8 on VNNI CPUs, float32 where int8 would be slower, float16 on GPU).
+# Override with WHISPER_COMPUTE_TYPE, e.g. "int8" or "float32".
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "auto")
+
+# "auto" runs on a CUDA GPU when CTranslate2 finds one, else on the CPU.
+# Override with WHISPER_DEVICE="cpu" or "cuda".
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE", "auto")
+
+# Number of 30 s windows decoded together; 4 suits the CPU thread budget
+# below, a GPU has room for 16.
+WHISPER_BATCH_SIZE = {"cpu": 4, "cuda": 16}
+
+# Concurrent CTranslate2 encode/generate calls the model can overlap;
+# feature extraction already runs on the executor threads calling
+# transcribe. Each worker gets its own cpu_threads, so raising it
+# multiplies the thread count and can oversubscribe the CPU.
+WHISPER_NUM_WORKERS = int(os.environ.get("WHISPER_NUM_WORKERS", "1"))
+
+# English-only checkpoints, chosen per upload. base.en costs the same as
+# the multilingual base the app used to run; small.en has a roughly 4x
+# heavier encoder and is loaded (and kept resident) only once picked.
+WHISPER_MODELS = {"Faster": "base.en", "More accurate": "small.en"}
+WHISPER_DEFAULT_MODEL = WHISPER_MODELS["Faster"]
+
+@st.cache_resource
+def load_whisper(model_size=WHISPER_DEFAULT_MODEL):
+    import numpy as np
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+    model = WhisperModel(
+        model_size,
+        device=WHISPER_DEVICE,
+        compute_type=WHISPER_COMPUTE_TYPE,
+        cpu_threads=max(4, (os.cpu_count() or 1) // 2),
+        num_workers=WHISPER_NUM_WORKERS,
+    )
+    pipeline = BatchedInferencePipeline(model=model)
+    # warm up on 15 s of silence so the first upload doesn't pay for it.
+    # The batched VAD path real uploads take loads Silero; VAD then drops
+    # all of the silence, so a plain pass runs the encoder and decoder.
+    # Segments are lazy, so consume them
+    silence = np.zeros(16000 * 15, dtype=np.float32)
+    segments, _ = _run_pipeline(pipeline, silence)
+    for _ in segments:
+        pass
+    segments, _ = model.transcribe(silence, language="en", beam_size=1)
+    for _ in segments:
+        pass
+    return pipeline
+
+def _run_pipeline(pipeline, audio):
+    # pipeline -> WhisperModel -> CTranslate2 model, which knows its device
+    device = pipeline.model.model.device
+    return pipeline.transcribe(
+        audio,
+        batch_size=WHISPER_BATCH_SIZE[device],
+        language="en",
+        beam_size=1,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=500),
+        condition_on_previous_text=False,
+        without_timestamps=True,
+    )
+
+# Student transcripts are kept on disk, one JSON file per recording and
+# model, so restarts skip Whisper too; only the TRANSCRIPT_CACHE_MAX most
+# recently used are kept. (Streamlit's persist="disk" never evicts.)
+TRANSCRIPT_DIR = Path.cwd() / "transcripts"
+TRANSCRIPT_DIR.mkdir(exist_ok=True)
+TRANSCRIPT_CACHE_MAX = 256
+
+def _read_transcript(path):
+    try:
+        result = tuple(json.loads(path.read_text()))
+    except (OSError, ValueError):
+        return None
+    path.touch()
+    return result
+
+def _write_transcript(path, result):
+    # written under a temp name and renamed, so a reader never sees half a file
+    with tempfile.NamedTemporaryFile(
+        "w", dir=TRANSCRIPT_DIR, suffix=".tmp", delete=False
+    ) as f:
+        json.dump(result, f)
+    os.replace(f.name, path)
+    stored = sorted(TRANSCRIPT_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in stored[:-TRANSCRIPT_CACHE_MAX]:
+        old.unlink(missing_ok=True)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def transcribe_audio(audio_hash, model_size, _model, _audio_bytes, _segment_queue):
+    """
+    Transcribe the uploaded recording, decoded in memory.
+    Cached in memory and in TRANSCRIPT_DIR by the content hash and model, so
+    reruns and re-uploads of the same recording never reach Whisper. On a
+    cache miss each segment's text is pushed to _segment_queue as soon as
+    it is decoded.
+    """
+    path = TRANSCRIPT_DIR / f"{audio_hash}-{model_size}.json"
+    cached = _read_transcript(path)
+    if cached is not None:
+        return cached
+
+    from faster_whisper import decode_audio
+
+    # 16 kHz mono float32, resampled by PyAV; no temp file and no re-read
+    audio = decode_audio(io.BytesIO(_audio_bytes), sampling_rate=16000)
+    segments, info = _run_pipeline(_model, audio)
+    parts = []
+    for seg in segments:
+        parts.append(seg.text.strip())
+        _segment_queue.put(parts[-1])
+    # duration_after_vad is the time spent speaking, pauses excluded
+    result = (" ".join(parts).strip(), info.duration, info.duration_after_vad)
+    _write_transcript(path, result)
+    return result
+
+def transcription_worker(audio_hash, model_size, audio_bytes, segment_queue):
+    # runs on the executor, model load included; None always marks the
+    # end of the stream, including cache hits where no segment is pushed
+    try:
+        model = load_whisper(model_size)
+        return transcribe_audio(audio_hash, model_size, model, audio_bytes, segment_queue)
+    finally:
+        segment_queue.put(None)
+
+def _stream_segments(segment_queue):
+    for text in iter(segment_queue.get, None):
+        yield text + " "
+
+def transcribe_upload(audio_bytes, placeholder, model_size=WHISPER_DEFAULT_MODEL):
+    """
+    Transcribe audio_bytes with the model_size checkpoint on the executor
+    while the script thread streams each decoded segment into placeholder.
+    Returns (transcript, duration_seconds, speech_seconds).
+    """
+    audio_hash = hashlib.blake2b(audio_bytes, digest_size=16).hexdigest()
+    segment_queue = queue.Queue()
+    future = get_executor().submit(
+        transcription_worker,
+        audio_hash,
+        model_size,
+        audio_bytes,
+        segment_queue,
+    )
+    # write_stream shows the text as it arrives, with a typing cursor;
+    # it still re-sends the whole markdown per chunk, like placeholder.write
+    placeholder.write_stream(_stream_segments(segment_queue))
+    return future.result()
+
+# start loading the default model as soon as an app imports this module,
+# once per process; an upload that arrives first waits on the same
+# st.cache_resource entry instead of loading it twice
+get_executor().submit(load_whisper, WHISPER_DEFAULT_MODEL)
@@ -0,0 +1,20 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import streamlit as st
+
+@st.cache_resource
+def get_executor():
+    # shared by every session; runs transcriptions off the script thread
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource
+def get_pdf_pool():
+    # ReportLab layout is pure Python and holds the GIL, so reports go to
+    # worker processes; core.pdf imports no Streamlit and pickles cleanly.
+    # spawn, because forking the threaded Streamlit server is unsafe.
+    return ProcessPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
@@ -0,0 +1,197 @@
+import re
+import functools
+from importlib.resources import files
+
+import pandas as pd
+import streamlit as st
+from symspellpy import SymSpell, Verbosity
+
+# Edit distance for spelling suggestions; 1 keeps corrections to obvious typos.
+SPELL_MAX_EDIT_DISTANCE = 1
+
+ISSUE_COLUMNS = ["Type", "Original", "Suggestion", "Message"]
+
+@st.cache_resource
+def load_symspell():
+    sym = SymSpell(max_dictionary_edit_distance=SPELL_MAX_EDIT_DISTANCE, prefix_length=7)
+    sym.load_dictionary(
+        str(files("symspellpy") / "frequency_dictionary_en_82_765.txt"),
+        term_index=0,
+        count_index=1,
+    )
+    return sym
+
+@st.cache_resource
+def load_vocab():
+    # lowercase dictionary terms, for set-difference lookups
+    return frozenset(load_symspell().words)
+
+@functools.lru_cache(maxsize=4096)
+def spell_correction(word):
+    # most frequent dictionary term at the smallest edit distance;
+    # memoized so a repeated typo is looked up once per process
+    suggestions = load_symspell().lookup(
+        word, Verbosity.CLOSEST, max_edit_distance=SPELL_MAX_EDIT_DISTANCE
+    )
+    return suggestions[0].term if suggestions else None
+
+_WORD_RE = re.compile(r"[A-Za-z']+")
+_TOKEN_RE = re.compile(r"[A-Za-z']+|[0-9]+|[^\w\s]")
+
+# (pattern, suggestion, message) for basic_grammar_checks
+_GRAMMAR_RULES = [
+    (r"\boman are\b", "Oman is", "Subject–verb agreement: 'Oman is' not 'Oman are'."),
+    (r"\b(today class is)\b", "Today's class is", "Use possessive form: 'Today's class'."),
+    (r"\bi wnat\b", "I want", "Common misspelling/phrase correction: 'I want'."),
+    (r"\bevry\b", "every", "Common misspelling: 'every'."),
+    (r"\bcontry\b", "country", "Common misspelling: 'country'."),
+]
+# all rules as one alternation (group r<i> = rule i), so the text is scanned once
+_GRAMMAR_RE = re.compile(
+    "|".join(f"(?P<r{i}>{p})" for i, (p, _, _) in enumerate(_GRAMMAR_RULES))
+)
+_OMAN_RE = re.compile(r"\boman\b")
+_JORDAN_RE = re.compile(r"\blocated in jordan\b")
+
+def tokenize_with_positions(text):
+    # words + punctuation tokens
+    return [(m.group(0), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+
+def is_probable_proper_noun(word, original_text):
+    # preserve Oman, GCC, names, email-like tokens
+    if word.isupper() and len(word) <= 6:
+        return True
+    if word[:1].isupper():
+        return True
+    if "@" in word:
+        return True
+    return False
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def safe_spell_correct(text, _tokens=None):
+    """
+    Correct ONLY obvious spelling mistakes.
+    Preserve proper nouns and very short tokens.
+    Pass _tokens=tokenize_with_positions(text) if the caller already has
+    it, to skip re-tokenizing; it is not part of the cache key.
+    """
+    tokens = _tokens if _tokens is not None else tokenize_with_positions(text)
+    # surrounding quotes are stripped, with the offsets moved to match,
+    # so 'word' is checked and replaced like word
+    words = []
+    for tok, s, e in tokens:
+        if _WORD_RE.fullmatch(tok):
+            word = tok.strip("'")
+            if word:
+                s += tok.index(word)
+                words.append((word, s, s + len(word)))
+    misspelled = {tok.lower() for tok, _, _ in words} - load_vocab()
+
+    # preserve proper nouns and short words; contractions (an apostrophe
+    # left inside the word) are not in the SymSpell dictionary, so leave
+    # them alone too
+    candidates = [
+        (tok, s, e) for tok, s, e in words
+        if tok.lower() in misspelled
+        and not is_probable_proper_noun(tok, text)
+        and len(tok) > 2
+        and "'" not in tok
+    ]
+    # each unique misspelling is corrected once, not once per occurrence
+    corrections = {low: spell_correction(low) for low in {t[0].lower() for t in candidates}}
+
+    issues = []
+    replacements = []
+    for tok, s, e in candidates:
+        low = tok.lower()
+        suggestion = corrections[low]
+        # safety: only accept if suggestion exists and differs
+        if suggestion and suggestion != low:
+            replacements.append((s, e, suggestion))
+            issues.append({
+                "Type": "Spelling",
+                "Original": tok,
+                "Suggestion": suggestion,
+                "Message": f"Possible misspelling: '{tok}' → '{suggestion}'"
+            })
+
+    # stitch the untouched slices and replacements together in one pass
+    out = []
+    last = 0
+    for s, e, rep in sorted(replacements):
+        out.append(text[last:s])
+        out.append(rep)
+        last = e
+    out.append(text[last:])
+    corrected_text = "".join(out)
+
+    return corrected_text, issues
+
+def basic_grammar_checks(text):
+    """
+    Lightweight grammar flags (rule-based).
+    Not a full grammar engine, but reliable and cloud-safe.
+    """
+    issues = []
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    joined = " ".join(lines)
+
+    # 1) Sentence punctuation
+    if joined and joined[-1] not in ".!?":
+        issues.append({
+            "Type": "Grammar",
+            "Original": joined[-20:],
+            "Suggestion": joined + ".",
+            "Message": "Sentence may be missing ending punctuation."
+        })
+
+    # 2) Capitalization: first letter
+    if joined and joined[0].islower():
+        issues.append({
+            "Type": "Grammar",
+            "Original": joined[:20],
+            "Suggestion": joined[:1].upper() + joined[1:],
+            "Message": "Start sentences with a capital letter."
+        })
+
+    # 3) Common subject–verb agreement patterns (simple)
+    # "Oman are" -> "Oman is"
+    joined_low = joined.lower()
+    first_match = {}
+    for m in _GRAMMAR_RE.finditer(joined_low):
+        first_match.setdefault(m.lastgroup, m.group(0))
+    for i, (_, repl, msg) in enumerate(_GRAMMAR_RULES):
+        original = first_match.get(f"r{i}")
+        if original:
+            issues.append({
+                "Type": "Grammar",
+                "Original": original,
+                "Suggestion": repl,
+                "Message": msg
+            })
+
+    # 4) Location sanity (example: "Oman ... located in jordan")
+    if _OMAN_RE.search(joined_low) and _JORDAN_RE.search(joined_low):
+        issues.append({
+            "Type": "Grammar",
+            "Original": "located in jordan",
+            "Suggestion": "located in the Middle East (on the Arabian Peninsula).",
+            "Message": "Factual geography note: Oman is not located in Jordan."
+        })
+
+    return issues
+
+def merge_issues(spell_issues, grammar_issues):
+    return pd.DataFrame(spell_issues + grammar_issues, columns=ISSUE_COLUMNS)
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def analyze_text(text):
+    """
+    Spell and grammar pass over text, returning (corrected_text, issues).
+    Cached on the text, so reruns (e.g. the download click) skip the
+    checks and the issues DataFrame construction.
+    """
+    corrected_text, spelling_issues = safe_spell_correct(text)
+    grammar_issues = basic_grammar_checks(corrected_text)
+
+    return corrected_text, merge_issues(spelling_issues, grammar_issues)
@@ -0,0 +1,43 @@
+import io
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.pagesizes import A4
+
+REPORT_DIR = Path.cwd() / "reports"
+REPORT_DIR.mkdir(exist_ok=True)
+
+# built once at import
+PDF_STYLE = ParagraphStyle(name="Normal", fontSize=10, leading=12, spaceAfter=6)
+PDF_TITLE_STYLE = ParagraphStyle(name="Title", parent=PDF_STYLE, spaceAfter=12)
+
+def generate_pdf(filename, title, lines):
+    """
+    Render the report in memory and return the PDF bytes.
+    A copy is kept in REPORT_DIR under a unique name derived from filename.
+    """
+    buf = io.BytesIO()
+    # reports are a few KB, so compressing each page costs more than it saves
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4, pageCompression=0, title=title, author="EnglishApp"
+    )
+    # user text is escaped so "<" or "&" can't break the markup; the body
+    # is a single Paragraph so ReportLab parses it once
+    body = "<br/><br/>".join(escape(str(line)).replace("\n", "<br/>") for line in lines)
+    elements = [
+        Paragraph(f"<b>{escape(title)}</b>", PDF_TITLE_STYLE),
+        Paragraph(body, PDF_STYLE),
+    ]
+    doc.build(elements)
+    pdf_bytes = buf.getvalue()
+    # names only have second resolution, so two sessions can ask for the
+    # same one; the archive copy gets a unique suffix instead of clobbering
+    name = Path(filename)
+    with tempfile.NamedTemporaryFile(
+        dir=REPORT_DIR, prefix=f"{name.stem}_", suffix=name.suffix, delete=False
+    ) as f:
+        f.write(pdf_bytes)
+    return pdf_bytes
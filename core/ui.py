@@ -0,0 +1,17 @@
+import streamlit as st
+
+from core.nlp import ISSUE_COLUMNS
+
+# st.table is far lighter than the interactive grid but prints every cell
+# in full; the punctuation and capitalization checks suggest the whole
+# corrected text, so long cells stay in the grid, which truncates them
+TABLE_MAX_ROWS = 20
+TABLE_MAX_CELL = 80
+
+def show_issues(issues):
+    """Render a non-empty issues DataFrame as a table or a grid."""
+    longest = max(issues[col].astype(str).str.len().max() for col in ISSUE_COLUMNS)
+    if len(issues) < TABLE_MAX_ROWS and longest <= TABLE_MAX_CELL:
+        st.table(issues)
+    else:
+        st.dataframe(issues, use_container_width=True)